@@ -2,25 +2,40 @@
 
 import httpx
 import asyncio
+import logging
+import orjson
 from typing import Any
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 NOMINATIM_API_BASE = "https://nominatim.openstreetmap.org"
 NWS_API_BASE = "https://api.weather.gov"
+GEOCODE_URL = f"{NOMINATIM_API_BASE}/search"
+
+
+logger = logging.getLogger(__name__)
+
+_CLIENT = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
+
+# Nominatim's usage policy allows at most one request per second
+_NOMINATIM_SLOT = asyncio.Semaphore(1)
 
 
-async def make_request(url: str, headers: dict = None) -> dict[str, Any] | None:
+async def make_request(url: str, headers: dict = None, params: dict = None) -> dict[str, Any] | None:
     """Make an async HTTP request with error handling."""
-    async with httpx.AsyncClient() as client:
-        try:
-            print(f"Fetching: {url}")
-            response = await client.get(url, headers=headers, timeout=30.0, follow_redirects=True)
-            print(f"Status: {response.status_code}")
-            if response.status_code == 200:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"Error: {e}")
-            return None
+    try:
+        logger.info("Fetching: %s %s", url, params or "")
+        response = await _CLIENT.get(url, headers=headers, params=params)
+        logger.info("Status: %s", response.status_code)
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+        return None
+    except Exception as e:
+        logger.error("Error: %s", e)
+        return None
 
 
 async def test_location(location: str):
@@ -31,9 +46,11 @@ async def test_location(location: str):
     
     # Test geocoding
     print(f"1. Geocoding '{location}'...")
-    url = f"{NOMINATIM_API_BASE}/search?q={location}&format=json&limit=1&countrycodes=us"
+    params = {"q": location, "format": "json", "limit": 1, "countrycodes": "us"}
     headers = {"User-Agent": "WeatherApp/1.0 (weather-debug)"}
-    geocode_data = await make_request(url, headers)
+    async with _NOMINATIM_SLOT:
+        geocode_data = await make_request(GEOCODE_URL, headers, params)
+        await asyncio.sleep(1)
     
     if not geocode_data or len(geocode_data) == 0:
         print("❌ Geocoding failed - no results found")
@@ -47,7 +64,7 @@ async def test_location(location: str):
     
     # Test NWS points
     print(f"2. Fetching NWS points data...")
-    points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
+    points_url = f"{NWS_API_BASE}/points/{latitude:.4f},{longitude:.4f}"
     points_data = await make_request(points_url)
     
     if not points_data:
@@ -86,9 +103,14 @@ async def test_location(location: str):
 async def main():
     locations = ["New York", "San Francisco", "Los Angeles", "Texas"]
     
-    for loc in locations:
-        await test_location(loc)
+    try:
+        await asyncio.gather(*[test_location(loc) for loc in locations])
+    finally:
+        await _CLIENT.aclose()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
@@ -1,7 +1,7 @@
 """
-Weather Web Server - Local Flask server for weather forecasts
+Weather Web Server - Local Quart server for weather forecasts
 Accepts city/state names and returns current weather forecast
-Run: python weather_server.py
+Run: python weather_server.py (or: hypercorn --worker-class uvloop weather_server:app)
 Visit: http://localhost:5000
 
 Files referenced:
@@ -13,52 +13,378 @@ verify that the APIs are working correctly. (NOT REFERENCED DIRECTLY IN THIS FIL
 
 
 
-from flask import Flask, render_template, request, jsonify
+from quart import Quart, Response, render_template, request
+import httpcore
 import httpx
 import asyncio
-from typing import Any
+import diskcache
+import ipaddress
+import logging
+import operator
+import orjson
+import os
+import queue
+import socket
+import sqlite3
+import time
+import urllib.request
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Awaitable, Callable
 
-app = Flask(__name__)
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+app = Quart(__name__)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Set while serving if this module writes its own logs from a listener thread
+_log_listener: QueueListener | None = None
 
 # Constants
 NWS_API_BASE = "https://api.weather.gov"
 NOMINATIM_API_BASE = "https://nominatim.openstreetmap.org"
 USER_AGENT = "weather-app/1.0"
+GEOCODE_URL = f"{NOMINATIM_API_BASE}/search"
+CACHE_DIR = os.environ.get("WEATHER_CACHE_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "weather"
+)
+CACHE_SIZE_LIMIT = 100 * 1024 * 1024  # bytes
+CACHE_LOCK_TIMEOUT = 0.1  # seconds to wait on a disk cache locked by another worker
+CACHE_MAX_ENTRIES = 4096
+GEOCODE_CACHE_TTL = 24 * 60 * 60  # seconds
+POINTS_CACHE_TTL = 24 * 60 * 60  # seconds, NWS grid cells don't move
+FORECAST_CACHE_TTL = 5 * 60  # seconds, NWS refreshes forecasts roughly hourly
+ALERTS_CACHE_TTL = 60  # seconds
+ALERTS_TIMEOUT = 1.0  # seconds a forecast response will wait for alerts
+DNS_CACHE_TTL = 15 * 60  # seconds
+NOMINATIM_MIN_INTERVAL = 1.0  # seconds, Nominatim's usage policy allows 1 req/sec
+NOMINATIM_MAX_WAIT = 3.0  # seconds a geocode may queue for its Nominatim slot
+REQUEST_TIMEOUT = httpx.Timeout(connect=2.0, read=5.0, write=2.0, pool=1.0)
+REQUEST_RETRIES = 1
+RETRY_BACKOFF = 0.5  # seconds
+
+# Transient network failures worth one more attempt; HTTP error statuses never retry
+_RETRYABLE_ERRORS = (httpx.ConnectTimeout, httpx.ReadError)
+
+# Fields copied from each NWS forecast period, fetched in one itemgetter call
+_PERIOD_FIELDS = operator.itemgetter(
+    "name", "temperature", "temperatureUnit", "windSpeed", "windDirection", "detailedForecast"
+)
+
+# Geocode and /points results rarely change, so they live on disk where they
+# survive restarts and are shared by every worker process. Entries are stored
+# as JSON rather than pickles, so reading the cache can never execute code.
+_DISK_CACHE = diskcache.Cache(
+    CACHE_DIR, timeout=CACHE_LOCK_TIMEOUT, size_limit=CACHE_SIZE_LIMIT, disk=diskcache.JSONDisk
+)
+
+# In-process caches mapping key -> (expiry, value), expiry on the monotonic clock
+_RESPONSE_CACHE: dict[str, tuple[float, Any]] = {}
+
+# Spaces out Nominatim requests; _nominatim_next_ok is the earliest next send time
+_nominatim_next_ok = 0.0
+
+# The index page is static, so it is rendered once, at startup or on first request
+_index_html = b""
+
+# Upstream fetches currently in progress, so identical concurrent lookups share one
+_INFLIGHT: dict[str, asyncio.Task] = {}
+
+
+def _cache_get(cache: dict, key: Any) -> Any | None:
+    """Return a cached value, or None if it is missing or expired."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    expiry, value = entry
+    if expiry <= time.monotonic():
+        del cache[key]
+        return None
+    return value
 
 
-async def make_request(url: str, headers: dict = None) -> dict[str, Any] | None:
-    """Make an async HTTP request with error handling."""
-    if headers is None:
-        headers = {"User-Agent": USER_AGENT}
+def _cache_set(cache: dict, key: Any, value: Any, ttl: float) -> None:
+    """Store a value with a TTL, evicting the oldest entries past CACHE_MAX_ENTRIES."""
+    cache.pop(key, None)
+    cache[key] = (time.monotonic() + ttl, value)
+    while len(cache) > CACHE_MAX_ENTRIES:
+        # dicts keep insertion order, so the first key is the oldest entry
+        del cache[next(iter(cache))]
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that caches hostname lookups for DNS_CACHE_TTL.
+
+    Only the TCP connect goes to the resolved addresses; TLS still verifies
+    and sends SNI for the original hostname.
+    """
     
-    async with httpx.AsyncClient() as client:
+    def __init__(self, backend: httpcore.AsyncNetworkBackend):
+        self._backend = backend
+        self._addresses: dict[tuple[str, int], tuple[float, list[str]]] = {}
+    
+    async def resolve(self, host: str, port: int, timeout: float | None = None) -> list[str]:
+        """Return the cached public addresses for host, falling back to host itself."""
+        cached = _cache_get(self._addresses, (host, port))
+        if cached is not None:
+            return cached
+        
+        lookup = asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
         try:
-            response = await client.get(url, headers=headers, timeout=30.0, follow_redirects=True)
+            infos = await asyncio.wait_for(lookup, timeout)
+        except asyncio.TimeoutError as e:
+            raise httpcore.ConnectTimeout(f"DNS lookup for {host} timed out") from e
+        except OSError as e:
+            raise httpcore.ConnectError(e) from e
+        
+        # Never pin a hostname to a private or loopback answer
+        addresses = list(dict.fromkeys(
+            sockaddr[0] for *_, sockaddr in infos if ipaddress.ip_address(sockaddr[0]).is_global
+        ))
+        if not addresses:
+            return [host]
+        _cache_set(self._addresses, (host, port), addresses, DNS_CACHE_TTL)
+        return addresses
+    
+    async def connect_tcp(self, host: str, port: int, **kwargs) -> httpcore.AsyncNetworkStream:
+        addresses = await self.resolve(host, port, kwargs.get("timeout"))
+        error = None
+        for address in list(addresses):
+            try:
+                stream = await self._backend.connect_tcp(address, port, **kwargs)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+                continue
+            if address != addresses[0]:
+                # Try the address that worked first next time
+                addresses.remove(address)
+                addresses.insert(0, address)
+            return stream
+        raise error
+    
+    async def connect_unix_socket(self, path: str, **kwargs) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, **kwargs)
+    
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def _make_client() -> httpx.AsyncClient:
+    """Build the shared pooled client, caching DNS lookups where possible."""
+    limits = httpx.Limits(max_keepalive_connections=50, max_connections=100)
+    options = {"timeout": REQUEST_TIMEOUT, "follow_redirects": True, "headers": {"User-Agent": USER_AGENT}}
+    
+    # Passing transport= stops httpx from honouring the *_PROXY variables, and
+    # behind a proxy it's the proxy that resolves upstream hosts anyway
+    if urllib.request.getproxies().keys() & {"http", "https", "all"}:
+        return httpx.AsyncClient(http2=True, limits=limits, **options)
+    
+    transport = httpx.AsyncHTTPTransport(http2=True, limits=limits)
+    # httpx doesn't expose the network backend, so wrap the pool's own one and
+    # skip the DNS cache if a future httpcore moves it
+    pool = getattr(transport, "_pool", None)
+    if hasattr(pool, "_network_backend"):
+        pool._network_backend = CachingDNSBackend(pool._network_backend)
+    return httpx.AsyncClient(transport=transport, **options)
+
+
+# Created in before_serving and closed in after_serving, so its lifetime
+# matches the serving lifecycle even if the app is served more than once
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it if the app wasn't started via lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _make_client()
+    return _client
+
+
+async def warm_up() -> None:
+    """Open a pooled connection to the NWS API ahead of the first request.
+
+    Nominatim isn't warmed: an extra request there would count against its
+    1 req/sec policy and delay the first real geocode.
+    """
+    try:
+        await get_client().get(f"{NWS_API_BASE}/")
+    except httpx.HTTPError:
+        pass
+
+
+async def coalesce(key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Run fetch() once for all concurrent callers using the same key."""
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        _INFLIGHT[key] = task
+        
+        def done(finished: asyncio.Task) -> None:
+            if _INFLIGHT.get(key) is finished:
+                del _INFLIGHT[key]
+            if not finished.cancelled():
+                finished.exception()  # mark retrieved in case every caller went away
+        
+        task.add_done_callback(done)
+    
+    # The fetch runs in its own task and every caller, including the one that
+    # started it, awaits it through shield, so a cancelled caller (e.g. a client
+    # disconnect) neither cancels the fetch nor the other callers
+    return await asyncio.shield(task)
+
+
+async def make_request(
+    url: str,
+    headers: dict = None,
+    params: dict = None,
+    throttle: Callable[[], Awaitable[None]] = None,
+) -> dict[str, Any] | None:
+    """Make an async HTTP request with error handling.
+
+    If given, throttle() is awaited before every attempt, retries included.
+    """
+    for attempt in range(REQUEST_RETRIES + 1):
+        if throttle is not None:
+            await throttle()
+        try:
+            response = await get_client().get(url, headers=headers, params=params)
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             return None
         except Exception as e:
-            print(f"Error fetching {url}: {e}")
+            if isinstance(e, _RETRYABLE_ERRORS) and attempt < REQUEST_RETRIES:
+                logger.debug("Retrying %s after %s", url, e)
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+                continue
+            logger.error("Error fetching %s: %s", url, e)
             return None
 
 
+async def fetch_cached(url: str, ttl: float) -> dict[str, Any] | None:
+    """Fetch a JSON document, serving repeats from the response cache for ttl seconds."""
+    data = _cache_get(_RESPONSE_CACHE, url)
+    if data is None:
+        data = await coalesce(url, lambda: make_request(url))
+        if data:
+            _cache_set(_RESPONSE_CACHE, url, data, ttl)
+    return data
+
+
+async def fetch_alerts(url: str) -> list[str] | None:
+    """Fetch active alert headlines, or None if they are currently unavailable."""
+    cached = _cache_get(_RESPONSE_CACHE, url)
+    if cached is not None:
+        return cached[0]
+    
+    async def lookup() -> list[str] | None:
+        data = await make_request(url)
+        alerts = None
+        if data is not None:
+            alerts = [
+                feature["properties"]["headline"]
+                for feature in data.get("features", [])
+                if feature.get("properties", {}).get("headline")
+            ]
+        # Cached from inside the shared fetch so the real answer lands even when
+        # every caller stopped waiting; wrapped in a tuple so a failed lookup
+        # (None) is cached too and the endpoint is asked at most once per TTL
+        _cache_set(_RESPONSE_CACHE, url, (alerts,), ALERTS_CACHE_TTL)
+        return alerts
+    
+    try:
+        return await asyncio.wait_for(coalesce(url, lookup), ALERTS_TIMEOUT)
+    except asyncio.TimeoutError:
+        return None
+
+
+async def disk_cache_get(key: str) -> Any | None:
+    """Read from the disk cache off the event loop; any cache failure is a miss."""
+    try:
+        return await asyncio.to_thread(_DISK_CACHE.get, key)
+    except (diskcache.Timeout, sqlite3.Error) as e:
+        logger.warning("Disk cache read for %s failed: %s", key, e)
+        return None
+
+
+async def disk_cache_set(key: str, value: Any, ttl: float) -> None:
+    """Write to the disk cache off the event loop; failures only cost a future miss."""
+    try:
+        await asyncio.to_thread(_DISK_CACHE.set, key, value, expire=ttl)
+    except (diskcache.Timeout, sqlite3.Error) as e:
+        logger.warning("Disk cache write for %s failed: %s", key, e)
+
+
+class NominatimBusyError(Exception):
+    """Raised when the Nominatim rate limit queue is too long to join."""
+
+
+async def wait_for_nominatim() -> None:
+    """Wait for a Nominatim slot allowed by its rate limit.
+
+    Each caller reserves the next free slot up front, so the queue length is
+    known without waiting; raises NominatimBusyError rather than queueing for
+    more than NOMINATIM_MAX_WAIT.
+    """
+    global _nominatim_next_ok
+    now = time.monotonic()
+    slot = max(now, _nominatim_next_ok)
+    if slot - now > NOMINATIM_MAX_WAIT:
+        raise NominatimBusyError("Too many new locations are being looked up right now")
+    _nominatim_next_ok = slot + NOMINATIM_MIN_INTERVAL
+    await asyncio.sleep(slot - now)
+
+
 async def geocode_location(location: str) -> tuple[float, float] | None:
     """Convert city/state name to coordinates using Nominatim."""
-    url = f"{NOMINATIM_API_BASE}/search?q={location}&format=json&limit=1&countrycodes=us"
+    cache_key = location.strip().casefold()
+    cached = await disk_cache_get(f"geocode:{cache_key}")
+    if cached is not None:
+        return tuple(cached)
+    
+    params = {"q": location, "format": "json", "limit": 1, "countrycodes": "us"}
     headers = {"User-Agent": "WeatherApp/1.0 (weather-server)"}
-    data = await make_request(url, headers)
+    data = await coalesce(
+        f"geocode:{cache_key}", lambda: make_request(GEOCODE_URL, headers, params, wait_for_nominatim)
+    )
     
     if data and len(data) > 0:
         result = data[0]
-        return float(result["lat"]), float(result["lon"])
+        coords = float(result["lat"]), float(result["lon"])
+        await disk_cache_set(f"geocode:{cache_key}", coords, GEOCODE_CACHE_TTL)
+        return coords
     
     return None
 
 
+def format_period(period: dict) -> dict:
+    """Shape one NWS forecast period for the API response."""
+    name, temperature, unit, wind_speed, wind_direction, detailed_forecast = _PERIOD_FIELDS(period)
+    return {
+        "name": name,
+        "temperature": f"{temperature}°{unit}",
+        "windSpeed": wind_speed,
+        "windDirection": wind_direction,
+        "detailedForecast": detailed_forecast,
+        "icon": period.get("icon", "")
+    }
+
+
 async def get_forecast_for_location(location: str) -> dict:
     """Get weather forecast for a city/state or state name."""
     # Try to geocode the location
-    coords = await geocode_location(location)
+    try:
+        coords = await geocode_location(location)
+    except NominatimBusyError:
+        return {
+            "success": False,
+            "error": "Too many new locations are being looked up right now. Please try again in a few seconds."
+        }
     
     if not coords:
         return {
@@ -69,27 +395,46 @@ async def get_forecast_for_location(location: str) -> dict:
     latitude, longitude = coords
     
     try:
-        # Get the forecast grid points
-        points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-        points_data = await make_request(points_url)
+        # Resolve the forecast URL and place name, reusing them for nearby coordinates
+        points_key = f"points:{latitude:.4f},{longitude:.4f}"
+        grid_point = await disk_cache_get(points_key)
         
-        if not points_data:
-            return {
-                "success": False,
-                "error": "This location is not in a US forecast area."
-            }
-        
-        properties = points_data.get("properties", {})
+        if grid_point is None:
+            points_url = f"{NWS_API_BASE}/points/{latitude:.4f},{longitude:.4f}"
+            points_data = await coalesce(points_url, lambda: make_request(points_url))
+            
+            if not points_data:
+                return {
+                    "success": False,
+                    "error": "This location is not in a US forecast area."
+                }
+            
+            try:
+                properties = points_data["properties"]
+                forecast_url = properties["forecast"]
+            except KeyError:
+                return {
+                    "success": False,
+                    "error": "Forecast data not available for this location."
+                }
+            
+            try:
+                relative_location = properties["relativeLocation"]["properties"]
+                city, state = relative_location["city"], relative_location["state"]
+            except KeyError:
+                city = state = "Unknown"
+            
+            grid_point = (forecast_url, city, state)
+            await disk_cache_set(points_key, grid_point, POINTS_CACHE_TTL)
         
-        if "forecast" not in properties:
-            return {
-                "success": False,
-                "error": "Forecast data not available for this location."
-            }
+        forecast_url, city, state = grid_point
         
-        # Get the forecast
-        forecast_url = properties["forecast"]
-        forecast_data = await make_request(forecast_url)
+        # Get the forecast and active alerts concurrently
+        alerts_url = f"{NWS_API_BASE}/alerts/active?point={latitude:.4f},{longitude:.4f}"
+        forecast_data, alerts = await asyncio.gather(
+            fetch_cached(forecast_url, FORECAST_CACHE_TTL),
+            fetch_alerts(alerts_url),
+        )
         
         if not forecast_data:
             return {
@@ -97,25 +442,9 @@ async def get_forecast_for_location(location: str) -> dict:
                 "error": "Unable to fetch forecast data."
             }
         
-        # Get alerts for the location
-        points_props = points_data.get("properties", {})
-        relative_location = points_props.get("relativeLocation", {}).get("properties", {})
-        city = relative_location.get("city", "Unknown")
-        state = relative_location.get("state", "Unknown")
-        
         # Format forecast periods
         periods = forecast_data["properties"]["periods"]
-        forecast_periods = []
-        
-        for period in periods[:5]:  # Next 5 periods
-            forecast_periods.append({
-                "name": period["name"],
-                "temperature": f"{period['temperature']}°{period['temperatureUnit']}",
-                "windSpeed": period["windSpeed"],
-                "windDirection": period["windDirection"],
-                "detailedForecast": period["detailedForecast"],
-                "icon": period.get("icon", "")
-            })
+        forecast_periods = [format_period(period) for period in periods[:5]]  # Next 5 periods
         
         return {
             "success": True,
@@ -124,7 +453,8 @@ async def get_forecast_for_location(location: str) -> dict:
                 "latitude": latitude,
                 "longitude": longitude
             },
-            "forecast": forecast_periods
+            "forecast": forecast_periods,
+            "alerts": alerts
         }
     
     except Exception as e:
@@ -134,45 +464,104 @@ async def get_forecast_for_location(location: str) -> dict:
         }
 
 
+def json_response(data: Any) -> Response:
+    """Serialize data to a JSON response using orjson."""
+    return Response(orjson.dumps(data), mimetype="application/json")
+
+
+def start_logging() -> None:
+    """Queue log records to a listener thread so handlers never block on stream I/O.
+
+    Skipped when the root logger is already configured, so records keep
+    propagating to the application's or server's own handlers.
+    """
+    global _log_listener
+    if logging.getLogger().handlers:
+        return
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _log_listener = QueueListener(log_queue, stream_handler)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+    _log_listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued log records and restore normal propagation."""
+    global _log_listener
+    if _log_listener is None:
+        return
+    
+    for handler in logger.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+    logger.propagate = True
+    _log_listener.stop()
+    _log_listener = None
+
+
+@app.before_serving
+async def startup():
+    """Open the shared client, pre-render the index page and warm up upstream connections."""
+    global _index_html, _client
+    start_logging()
+    _client = _make_client()
+    _index_html = (await render_template("weather_index.html")).encode("utf-8")
+    app.add_background_task(warm_up)
+
+
+@app.after_serving
+async def shutdown():
+    """Close the shared HTTP client and the disk cache."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _DISK_CACHE.close()
+    stop_logging()
+
+
 @app.route("/")
-def index():
+async def index():
     """Serve the main weather page."""
-    return render_template("weather_index.html")
+    global _index_html
+    if not _index_html:
+        # before_serving doesn't run when lifespan events are disabled
+        _index_html = (await render_template("weather_index.html")).encode("utf-8")
+    return Response(_index_html, mimetype="text/html")
 
 
 @app.route("/api/forecast")
-def get_forecast():
+async def get_forecast():
     """API endpoint to get forecast for a location."""
     location = request.args.get("location", "").strip()
     
     if not location:
-        return jsonify({
+        return json_response({
             "success": False,
             "error": "Please provide a location (city or state name)"
         }), 400
     
-    # Run async function in event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        result = loop.run_until_complete(get_forecast_for_location(location))
-    finally:
-        loop.close()
+    result = await get_forecast_for_location(location)
     
-    return jsonify(result)
+    return json_response(result)
 
 
 @app.errorhandler(404)
-def not_found(e):
-    return jsonify({"error": "Endpoint not found"}), 404
+async def not_found(e):
+    return json_response({"error": "Endpoint not found"}), 404
 
 
 @app.errorhandler(500)
-def server_error(e):
-    return jsonify({"error": "Internal server error"}), 500
+async def server_error(e):
+    return json_response({"error": "Internal server error"}), 500
 
 
 if __name__ == "__main__":
     print("🌦️  Starting Weather Server on http://localhost:5000")
     print("Type a US city or state name to get the weather forecast")
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     app.run(debug=True, host="localhost", port=5000)